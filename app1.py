@@ -3,8 +3,15 @@ import pandas as pd
 import plotly.express as px
 import numpy as np
 import io
+import os
 import requests
 from streamlit_option_menu import option_menu
+from staff_optimizer import STAFF_MONTHLY_COST, UPDATES_PER_STAFF, optimize_staff_plan
+from forecast_store import read_forecast_store
+from background_loader import BackgroundLoader
+
+# Compact binary copy of forecast_output.csv (see forecast_store.py)
+FORECAST_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forecast_output.ufcs")
 
 # --------------------------- CONFIG + ULTIMATE GLOWING DARK MODE --------------------------- 
 st.set_page_config(
@@ -138,30 +145,36 @@ if 'selected_ages' not in st.session_state:
     st.session_state.selected_ages = ['👶 5-17 years', '🧑 18+ years']
 
 # --------------------------- DATA LOADER --------------------------- 
+FORECAST_ID = "1DGvaXazKNSat-g_JmjdknuO3CXgUrjfq"
+MERGED_ID = "1qORy0hmGIsUzlJA3mP33JcCCEFO7v9qz"
+
+def load_csv(file_id):
+    url = f"https://drive.google.com/uc?export=download&id={file_id}"
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    response = requests.get(url, headers=headers, timeout=30)
+    response.raise_for_status()
+    return pd.read_csv(io.StringIO(response.text))
+
 @st.cache_data(ttl=3600)
-def load_uidai_data():
-    FORECAST_ID = "1DGvaXazKNSat-g_JmjdknuO3CXgUrjfq"
-    MERGED_ID = "1qORy0hmGIsUzlJA3mP33JcCCEFO7v9qz"
-    
-    def load_csv(file_id):
-        url = f"https://drive.google.com/uc?export=download&id={file_id}"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return pd.read_csv(io.StringIO(response.text))
-    
-    forecast_df = load_csv(FORECAST_ID)
-    merged_df = load_csv(MERGED_ID)
+def load_forecast_data():
+    # Prefer the local binary forecast store; the Drive CSV is the fallback
+    if os.path.exists(FORECAST_STORE):
+        forecast_df = read_forecast_store(FORECAST_STORE, series='national', columns=['ds', 'yhat'])
+    else:
+        forecast_df = load_csv(FORECAST_ID)
     
     forecast_df['ds'] = pd.to_datetime(forecast_df['ds'])
-    merged_df['date'] = pd.to_datetime(merged_df['date'], dayfirst=True)
-    
-    forecast_df['staff_needed'] = (forecast_df['yhat'] * 0.001).astype(int)
-    forecast_df['monthly_staff_cost'] = forecast_df['staff_needed'] * 25000
+    forecast_df['staff_needed'] = (forecast_df['yhat'] / UPDATES_PER_STAFF).astype(int)
+    forecast_df['monthly_staff_cost'] = forecast_df['staff_needed'] * STAFF_MONTHLY_COST
     forecast_df['best_case'] = forecast_df['yhat'] * 0.9
     forecast_df['worst_case'] = forecast_df['yhat'] * 1.2
     forecast_df['demand_risk'] = np.where(forecast_df['yhat'] > forecast_df['yhat'].quantile(0.8), '🔴 High', '🟢 Low')
-    
+    return forecast_df
+
+def load_merged_data():
+    # Runs on a worker thread, so no st.* calls in here
+    merged_df = load_csv(MERGED_ID)
+    merged_df['date'] = pd.to_datetime(merged_df['date'], dayfirst=True)
     merged_df['total_updates'] = merged_df.get('bio_age_5_17', 0) + merged_df.get('bio_age_17_', 0)
     
     if 'state' in merged_df.columns:
@@ -174,9 +187,30 @@ def load_uidai_data():
         state_age_df = pd.DataFrame()
         all_states = []
     
-    return forecast_df, merged_df, state_age_df, all_states
+    return merged_df, state_age_df, all_states
+
+@st.cache_resource
+def get_merged_loader():
+    # One background download shared by every session, refreshed hourly
+    return BackgroundLoader(load_merged_data, refresh_seconds=3600)
 
-forecast_df, merged_df, state_age_df, all_states = load_uidai_data()
+# --------------------------- PROGRESSIVE LOAD --------------------------- 
+# The forecast store is a tiny local snapshot, so the summary and forecast render at once
+# while the large merged history downloads in the background.
+forecast_df = load_forecast_data()
+merged_loader = get_merged_loader()
+merged_data, merged_error = merged_loader.poll()
+merged_ready = merged_data is not None
+
+if merged_error is not None:
+    st.error(f"❌ Error loading historical data: {str(merged_error)}")
+if merged_ready:
+    merged_df, state_age_df, all_states = merged_data
+else:
+    merged_df, state_age_df, all_states = pd.DataFrame(), pd.DataFrame(), []
+
+def show_loading_notice():
+    st.info("⏳ Historical data is still loading in the background. This page will enable itself when it is ready.")
 
 # --------------------------- PERFECT WORKING FILTERS --------------------------- 
 with st.sidebar:
@@ -220,7 +254,7 @@ with st.sidebar:
     selected_states = st.multiselect(
         "🌍 States",
         options=all_states,
-        default=st.session_state.selected_states,
+        default=[s for s in st.session_state.selected_states if s in all_states],
         key="state_selector"
     )
     st.markdown('</div>', unsafe_allow_html=True)
@@ -249,8 +283,8 @@ with st.sidebar:
     st.markdown(f"""
     <div style='text-align: center; padding: 1rem; color: #94a3b8; font-size: 1rem;'>
         📊 <strong>{len(forecast_df):,}</strong> forecasts<br>
-        🧬 <strong>{len(merged_df):,}</strong> records<br>
-        🗺️ <strong>{len(all_states):,}</strong> states
+        🧬 <strong>{f"{len(merged_df):,}" if merged_ready else "⏳"}</strong> records<br>
+        🗺️ <strong>{f"{len(all_states):,}" if merged_ready else "⏳"}</strong> states
     </div>
     """, unsafe_allow_html=True)
 
@@ -308,6 +342,46 @@ elif selected == "📊 Planning":
     }), use_container_width=True, height=500)
     st.markdown('</div>', unsafe_allow_html=True)
 
+    st.markdown('<h2 class="section-title">🧮 Optimized Staff Allocation</h2>', unsafe_allow_html=True)
+    st.markdown('<div class="content-card">', unsafe_allow_html=True)
+    if not merged_ready:
+        show_loading_notice()
+    elif 'state' in merged_df.columns:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            operator_pool = st.number_input("👥 Operator Pool", min_value=0, step=100,
+                                            value=int(forecast_df['staff_needed'].max()))
+        with col2:
+            default_capacity = st.number_input("🗺️ Default Max Staff per State", min_value=0, step=50,
+                                             value=int(forecast_df['staff_needed'].max()))
+        with col3:
+            budget = st.number_input("💰 Budget ₹", min_value=0, step=STAFF_MONTHLY_COST * 100,
+                                     value=int(forecast_df['monthly_staff_cost'].sum()))
+
+        capacity_df = st.data_editor(
+            pd.DataFrame({'state': all_states, 'max_staff': int(default_capacity)}),
+            column_config={
+                'state': '🗺️ State',
+                'max_staff': st.column_config.NumberColumn('👥 Max Staff', min_value=0, step=1)
+            },
+            disabled=['state'], hide_index=True, use_container_width=True, key='state_capacity_editor'
+        )
+        state_capacity = dict(zip(capacity_df['state'], capacity_df['max_staff'].fillna(0).astype(int)))
+
+        plan_df, _ = optimize_staff_plan(forecast_df, merged_df, operator_pool, budget, state_capacity,
+                                         updates_per_staff=UPDATES_PER_STAFF)
+        compare_df = forecast_df[['ds', 'yhat', 'staff_needed', 'monthly_staff_cost']].merge(plan_df, on='ds')
+        st.dataframe(compare_df.rename(columns={
+            'ds':'📅 Month','yhat':'🎯 Expected','staff_needed':'👥 Naive Staff','monthly_staff_cost':'💰 Naive Cost ₹',
+            'optimized_staff':'🧮 Optimized Staff','optimized_cost':'💰 Optimized Cost ₹',
+            'served_demand':'✅ Served','coverage_pct':'📈 Coverage %'
+        }), use_container_width=True, height=500)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+elif selected == "📋 Historical" and not merged_ready:
+    st.markdown('<h2 class="section-title">📋 Historical Analysis</h2>', unsafe_allow_html=True)
+    show_loading_notice()
+
 elif selected == "📋 Historical":
     st.markdown('<h2 class="section-title">📋 Historical Analysis</h2>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
@@ -349,6 +423,10 @@ elif selected == "⚙️ Scenarios":
         st.plotly_chart(fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
+elif selected == "👥 Demographics" and not merged_ready:
+    st.markdown('<h2 class="section-title">👥 Demographics Analysis</h2>', unsafe_allow_html=True)
+    show_loading_notice()
+
 elif selected == "👥 Demographics":
     st.markdown('<h2 class="section-title">👥 Demographics Analysis</h2>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
@@ -382,3 +460,18 @@ st.markdown("""
     🌟 ULTIMATE UIDAI DASHBOARD | All Filters ✅ | Glowing Effects ✨ | January 2026
 </div>
 """, unsafe_allow_html=True)
+
+# --------------------------- FINISH BACKGROUND LOAD --------------------------- 
+# Everything above is already on screen. This fragment polls on its own timer, so widgets
+# stay responsive, and reruns the whole app once the merged data arrives to enable the
+# Historical and Demographics pages and the state filters.
+@st.fragment(run_every=1)
+def watch_merged_load():
+    data, error = merged_loader.poll()
+    if data is not None or error is not merged_error:
+        st.rerun()
+    st.caption("⏳ Loading historical data..." if merged_loader.loading else "⏳ Retrying historical data download shortly...")
+
+if not merged_ready:
+    with st.sidebar:
+        watch_merged_load()
@@ -0,0 +1,44 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundLoader:
+    """
+    Runs `load_fn` on a single worker thread and shares the result between sessions.
+
+    The last good result keeps being served while a refresh runs. After a failure the error
+    is kept for every session to see, and the next attempt waits `retry_seconds`.
+    `load_fn` runs off the script thread, so it must not call st.* functions.
+    """
+
+    def __init__(self, load_fn, refresh_seconds=3600, retry_seconds=60):
+        self.load_fn = load_fn
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.data = None
+        self.error = None
+        self.loaded_at = 0.0
+        self.retry_after = 0.0
+        self.future = self.executor.submit(load_fn)
+
+    @property
+    def loading(self):
+        return self.future is not None and not self.future.done()
+
+    def poll(self):
+        """Collect a finished load and start the next one when due. Returns (data or None, last error or None)."""
+        with self.lock:
+            now = time.time()
+            if self.future is not None and self.future.done():
+                try:
+                    self.data, self.loaded_at, self.error = self.future.result(), now, None
+                except Exception as e:
+                    self.error, self.retry_after = e, now + self.retry_seconds
+                self.future = None
+            stale = self.data is None or now - self.loaded_at > self.refresh_seconds
+            if self.future is None and stale and now >= self.retry_after:
+                self.future = self.executor.submit(self.load_fn)
+            return self.data, self.error
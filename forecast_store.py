@@ -0,0 +1,255 @@
+import json
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+# --------------------------- FORMAT ---------------------------
+# [magic 4s][version H][header length I][JSON header][column blocks ...]
+# All series are stacked row-wise and each column is one contiguous little-endian block:
+#   ds -> int32 days since epoch, numeric -> float32, text -> uint8 category codes.
+# The header records the row range of every series, so one series or one column can be
+# sliced straight out of the file without touching the rest.
+MAGIC = b"UFCS"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sHI")
+
+# Prophet output columns that carry no extra information, mapped to the column they duplicate
+# (None means the column is all zeros). They are only dropped when every series confirms it at
+# the stored float32 precision; the header keeps the rule so readers can rebuild them.
+REDUNDANT_COLUMNS = {
+    'additive_terms': 'yearly',
+    'additive_terms_lower': 'yearly',
+    'additive_terms_upper': 'yearly',
+    'yearly_lower': 'yearly',
+    'yearly_upper': 'yearly',
+    'multiplicative_terms': None,
+    'multiplicative_terms_lower': None,
+    'multiplicative_terms_upper': None,
+}
+
+_DTYPES = {'date': np.dtype('<i4'), 'float': np.dtype('<f4'), 'category': np.dtype('u1')}
+_MISSING_DATE = np.iinfo(np.int32).min
+
+
+def _is_redundant(df, col):
+    if col not in df.columns:
+        return False
+    ref = REDUNDANT_COLUMNS[col]
+    if ref is None:
+        return bool((df[col] == 0).all())
+    # exact match once both are rounded to the float32 that would be stored
+    return ref in df.columns and np.array_equal(df[col].to_numpy(dtype=_DTYPES['float']),
+                                                df[ref].to_numpy(dtype=_DTYPES['float']))
+
+
+def _encode(values, kind, labels=None):
+    if kind == 'date':
+        days = pd.to_datetime(values).to_numpy('datetime64[D]')
+        return np.where(np.isnat(days), _MISSING_DATE, days.astype(np.int64)).astype(_DTYPES[kind])
+    if kind == 'float':
+        return values.to_numpy(dtype=np.float64).astype(_DTYPES[kind])
+    # code 0 is reserved for missing values
+    codes = pd.Categorical(values.astype('string'), categories=labels).codes
+    return (codes.astype(np.int16) + 1).astype(_DTYPES[kind])
+
+
+def _decode(values, kind, labels=None):
+    if kind == 'date':
+        days = values.astype('datetime64[D]')
+        return pd.to_datetime(np.where(values == _MISSING_DATE, np.datetime64('NaT'), days))
+    if kind == 'float':
+        return np.array(values)
+    return pd.Categorical.from_codes(values.astype(np.int16) - 1, categories=labels)
+
+
+# --------------------------- WRITE ---------------------------
+def write_forecast_store(path, series, model_version=None, training_cutoff=None):
+    """
+    Write one or more forecasts to a compact binary store.
+
+    `series` maps a series key (e.g. "national" or a state name) to its forecast DataFrame.
+    `model_version` and `training_cutoff` are recorded for every series; pass a dict keyed
+    like `series` to give each series its own values.
+    """
+    # a column is only dropped when it is redundant in every series, so all of them rebuild it
+    derived = {
+        col: ref for col, ref in REDUNDANT_COLUMNS.items()
+        if series and all(_is_redundant(df, col) for df in series.values())
+    }
+    order = list(dict.fromkeys(c for df in series.values() for c in df.columns))
+    frames = {str(key): df.drop(columns=[c for c in derived if c in df.columns])
+              for key, df in series.items()}
+    stacked = pd.concat(frames.values(), ignore_index=True, sort=False) if frames else pd.DataFrame()
+
+    kinds, categories = {}, {}
+    for col in stacked.columns:
+        if col == 'ds':
+            kinds[col] = 'date'
+        elif pd.api.types.is_numeric_dtype(stacked[col]):
+            kinds[col] = 'float'
+        else:
+            kinds[col] = 'category'
+            categories[col] = sorted(stacked[col].dropna().astype(str).unique().tolist())
+            if len(categories[col]) > 255:
+                raise ValueError(f"Column '{col}' has too many distinct values for the forecast store")
+
+    blocks, columns, offset = [], {}, 0
+    for col, kind in kinds.items():
+        data = _encode(stacked[col], kind, categories.get(col)).tobytes()
+        columns[col] = offset
+        blocks.append(data)
+        offset += len(data)
+
+    def per_series(value, key):
+        value = value.get(key) if isinstance(value, dict) else value
+        return None if value is None else str(value)
+
+    index, row = {}, 0
+    for key, df in frames.items():
+        index[key] = {
+            'start': row,
+            'rows': len(df),
+            'model_version': per_series(model_version, key),
+            'training_cutoff': per_series(training_cutoff, key),
+        }
+        row += len(df)
+
+    header = json.dumps({
+        'rows': len(stacked),
+        'kinds': kinds,
+        'categories': categories,
+        'columns': columns,
+        'derived': derived,
+        'order': order,
+        'series': index,
+    }, separators=(',', ':')).encode('utf-8')
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for data in blocks:
+            f.write(data)
+
+
+# --------------------------- READ ---------------------------
+def _read_header(f):
+    magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+    if magic != MAGIC:
+        raise ValueError("Not a forecast store file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Forecast store version {version} is newer than supported ({FORMAT_VERSION})")
+    header = json.loads(f.read(header_len))
+    header['data_start'] = _PREAMBLE.size + header_len
+    return header
+
+
+class ForecastStore:
+    """
+    Reader that parses the header and maps the file once, for repeated lookups.
+
+    store = ForecastStore('forecast_output.ufcs')
+    store.read('national', columns=['ds', 'yhat'])
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.header = _read_header(f)
+        self._raw = np.memmap(path, dtype=np.uint8, mode='r', offset=self.header['data_start']) \
+            if self.header['rows'] else None
+
+    @property
+    def series_keys(self):
+        return list(self.header['series'])
+
+    def metadata(self):
+        """Return {series key: {'rows', 'model_version', 'training_cutoff'}}."""
+        return {
+            key: {k: v for k, v in info.items() if k != 'start'}
+            for key, info in self.header['series'].items()
+        }
+
+    def _column(self, col):
+        kind = self.header['kinds'][col]
+        dtype = _DTYPES[kind]
+        if self._raw is None:
+            return np.empty(0, dtype=dtype), kind
+        first = self.header['columns'][col]
+        return self._raw[first:first + self.header['rows'] * dtype.itemsize].view(dtype), kind
+
+    def read(self, series=None, columns=None):
+        """
+        Load forecasts.
+
+        `series` may be one key (returns just that series), a list of keys, or None for every
+        series; the last two are stacked with a categorical `series` column. `columns` limits
+        which columns are read from disk; by default every original column is returned, in the
+        order it was written, with dropped redundant columns rebuilt.
+        """
+        header = self.header
+        stored, derived = header['columns'], header.get('derived', {})
+        wanted = columns if columns is not None else header.get('order', list(stored))
+        missing = [c for c in wanted if c not in stored and c not in derived]
+        if missing:
+            raise KeyError(f"Columns not in forecast store: {missing}")
+
+        single = series is not None and not isinstance(series, (list, tuple))
+        keys = self.series_keys if series is None else list(series) if not single else [series]
+        infos = []
+        for key in keys:
+            info = header['series'].get(str(key))
+            if info is None:
+                raise KeyError(f"Series '{key}' not found in forecast store")
+            infos.append(info)
+
+        if series is None:
+            rows = slice(None)
+        elif single:
+            rows = slice(infos[0]['start'], infos[0]['start'] + infos[0]['rows'])
+        elif infos:
+            rows = np.concatenate([np.arange(i['start'], i['start'] + i['rows']) for i in infos])
+        else:
+            rows = np.empty(0, dtype=np.int64)
+
+        data = {}
+        if not single:
+            counts = [i['rows'] for i in infos]
+            data['series'] = pd.Categorical.from_codes(np.repeat(np.arange(len(keys)), counts),
+                                                       categories=[str(k) for k in keys])
+        n_rows = sum(i['rows'] for i in infos)
+        for col in wanted:
+            if col in stored:
+                values, kind = self._column(col)
+                data[col] = _decode(values[rows], kind, header['categories'].get(col))
+            elif derived[col] is None:
+                data[col] = np.zeros(n_rows, dtype=_DTYPES['float'])
+            else:
+                values, kind = self._column(derived[col])
+                data[col] = _decode(values[rows], kind)
+        return pd.DataFrame(data)
+
+
+def read_forecast_metadata(path):
+    """Return {series key: {'rows', 'model_version', 'training_cutoff'}} without loading any values."""
+    return ForecastStore(path).metadata()
+
+
+def read_forecast_store(path, series=None, columns=None):
+    """One-off read; see ForecastStore.read. Use ForecastStore directly for many lookups."""
+    return ForecastStore(path).read(series, columns)
+
+
+# --------------------------- CLI ---------------------------
+if __name__ == '__main__':
+    # python forecast_store.py forecast_output.csv forecast_output.ufcs [series_key] [model_version] [training_cutoff]
+    if len(sys.argv) < 3:
+        sys.exit("usage: python forecast_store.py SOURCE.csv DEST.ufcs [series_key] [model_version] [training_cutoff]")
+    src, dest = sys.argv[1], sys.argv[2]
+    key = sys.argv[3] if len(sys.argv) > 3 else 'national'
+    version = sys.argv[4] if len(sys.argv) > 4 else 'prophet'
+    cutoff = sys.argv[5] if len(sys.argv) > 5 else None
+
+    df = pd.read_csv(src)
+    write_forecast_store(dest, {key: df}, model_version=version, training_cutoff=cutoff)
+    print(f"Wrote {dest}: {len(df)} rows, series '{key}'")
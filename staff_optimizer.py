@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+STAFF_MONTHLY_COST = 25000
+# Biometric updates one operator handles per month; the naive plan uses the same ratio
+UPDATES_PER_STAFF = 1000
+
+
+# --------------------------- CORE ALLOCATION ---------------------------
+def _largest_remainder(quota, totals):
+    """Floor a fractional quota along axis 0, handing leftover units to the largest fractions."""
+    base = np.floor(quota).astype(np.int64)
+    leftover = np.maximum(totals - base.sum(axis=0), 0).astype(np.int64)
+    # rank rows by fractional part within each column; the top `leftover` rows get +1
+    order = np.argsort(-(quota - base), axis=0, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(quota.shape[0])[:, None], axis=0)
+    return base + (ranks < leftover).astype(np.int64)
+
+
+def _scale_down(need, limit):
+    """Shrink each column of `need` so it sums to at most `limit`, keeping integer units."""
+    totals = need.sum(axis=0)
+    over = totals > limit
+    if not over.any():
+        return need
+    ratio = np.where(over, limit / np.maximum(totals, 1), 1.0)
+    quota = need * ratio
+    scaled = _largest_remainder(quota, np.where(over, limit, totals))
+    return np.minimum(scaled, need)
+
+
+def allocate_staff(demand, state_capacity, operator_pool, budget,
+                   updates_per_staff=UPDATES_PER_STAFF, staff_cost=STAFF_MONTHLY_COST):
+    """
+    Allocate a fixed operator pool over a (units x months) demand matrix.
+
+    Each cell is capped by the unit's capacity, each month by the operator pool, and the
+    whole plan by the budget. These limits nest (cell inside month inside plan), so taking
+    operators greedily by updates served maximises served demand: first every operator
+    with a full load, shared proportionally since they are interchangeable, then the one
+    partly-loaded operator per cell in descending order of its leftover demand.
+    """
+    if updates_per_staff <= 0:
+        raise ValueError("updates_per_staff must be positive")
+    demand = np.clip(np.asarray(demand, dtype=np.float64), 0, None)
+    if demand.ndim != 2:
+        raise ValueError("demand must be a 2-D (units x months) array")
+    capacity = np.broadcast_to(np.asarray(state_capacity, dtype=np.float64), demand.shape[:1])
+    if not np.isfinite(capacity).all() or (capacity < 0).any():
+        raise ValueError("state_capacity must be finite and non-negative")
+    capacity = capacity.astype(np.int64)[:, None]
+    pool = np.full(demand.shape[1], int(operator_pool))
+    staff_months = int(budget // staff_cost)
+
+    # 1) operators that would serve a full load
+    full = np.floor(demand / updates_per_staff).astype(np.int64)
+    alloc = np.minimum(full, capacity)
+    alloc = _scale_down(alloc, pool)
+    alloc = _scale_down(alloc.reshape(-1, 1), np.array([staff_months])).reshape(alloc.shape)
+
+    # 2) one partly-loaded operator per cell, biggest leftover demand first
+    leftover = demand - full * updates_per_staff
+    candidate = (leftover > 0) & (alloc == full) & (alloc < capacity)
+    pool_left = pool - alloc.sum(axis=0)
+    budget_left = staff_months - alloc.sum()
+
+    units, months = np.nonzero(candidate)
+    order = np.argsort(-leftover[units, months], kind='stable')
+    units, months = units[order], months[order]
+    # position of each candidate among earlier candidates of the same month
+    month_sorted = np.argsort(months, kind='stable')
+    month_rank = np.empty_like(month_sorted)
+    starts = np.searchsorted(months[month_sorted], months[month_sorted])
+    month_rank[month_sorted] = np.arange(len(months)) - starts
+    fits_pool = month_rank < pool_left[months]
+    take = fits_pool & (np.cumsum(fits_pool) <= budget_left)
+    alloc[units[take], months[take]] += 1
+    return alloc
+
+
+# --------------------------- DATAFRAME WRAPPER ---------------------------
+def state_demand_shares(merged_df, unit_col='state'):
+    """Historical share of total updates per unit (state or district)."""
+    totals = merged_df.groupby(unit_col)['total_updates'].sum()
+    totals = totals[totals > 0]
+    return totals / totals.sum()
+
+
+def optimize_staff_plan(forecast_df, merged_df, operator_pool, budget, state_capacity,
+                        unit_col='state', updates_per_staff=UPDATES_PER_STAFF, staff_cost=STAFF_MONTHLY_COST):
+    """
+    Split the national forecast across units by historical share and solve the allocation.
+
+    `state_capacity` is a single cap for every unit or a mapping of unit -> cap.
+    Returns (monthly plan, unit x month allocation).
+    """
+    shares = state_demand_shares(merged_df, unit_col)
+    units = shares.index
+    yhat = forecast_df['yhat'].clip(lower=0).to_numpy(dtype=np.float64)
+    demand = shares.to_numpy()[:, None] * yhat[None, :]
+
+    if isinstance(state_capacity, dict):
+        capacity = np.array([state_capacity.get(u, operator_pool) for u in units], dtype=np.float64)
+    else:
+        capacity = np.full(len(units), state_capacity, dtype=np.float64)
+
+    alloc = allocate_staff(demand, capacity, operator_pool, budget, updates_per_staff, staff_cost)
+    served = np.minimum(alloc * updates_per_staff, demand).sum(axis=0)
+
+    plan = pd.DataFrame({
+        'ds': forecast_df['ds'].to_numpy(),
+        'optimized_staff': alloc.sum(axis=0),
+        'optimized_cost': alloc.sum(axis=0) * staff_cost,
+        'served_demand': served,
+        'coverage_pct': np.where(yhat > 0, served / np.maximum(yhat, 1) * 100, 100.0).round(1),
+    })
+    allocation = pd.DataFrame(alloc, index=units, columns=forecast_df['ds'].to_numpy())
+    return plan, allocation
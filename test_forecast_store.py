@@ -0,0 +1,83 @@
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_store import FORMAT_VERSION, MAGIC, ForecastStore, read_forecast_store, write_forecast_store
+
+CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forecast_output.csv')
+
+
+@pytest.fixture
+def forecast():
+    return pd.read_csv(CSV, parse_dates=['ds'])
+
+
+def test_round_trip(tmp_path, forecast):
+    path = tmp_path / 'forecast.ufcs'
+    write_forecast_store(path, {'national': forecast}, model_version='prophet', training_cutoff='2025-11-30')
+    store = ForecastStore(path)
+    df = store.read('national')
+
+    # redundant columns are not stored, but a full read rebuilds them in the original order
+    assert 'additive_terms' not in store.header['columns']
+    assert list(df.columns) == list(forecast.columns)
+    assert (df['ds'] == forecast['ds']).all()
+    for col in forecast.select_dtypes('number').columns:
+        np.testing.assert_array_equal(df[col], forecast[col].to_numpy(dtype=np.float32))
+    for col in ['demand_risk', 'recommended_action']:
+        assert df[col].astype(str).tolist() == forecast[col].tolist()
+    assert store.metadata() == {
+        'national': {'rows': 12, 'model_version': 'prophet', 'training_cutoff': '2025-11-30'}
+    }
+
+
+def test_multi_series_and_selected_columns(tmp_path, forecast):
+    other = forecast.assign(yhat=forecast['yhat'] * 2, multiplicative_terms=1.0)
+    path = tmp_path / 'forecast.ufcs'
+    write_forecast_store(path, {'A': forecast, 'B': other, 'C': forecast})
+    store = ForecastStore(path)
+
+    df = store.read(['C', 'B'], columns=['ds', 'yhat', 'multiplicative_terms', 'additive_terms'])
+    assert list(df.columns) == ['series', 'ds', 'yhat', 'multiplicative_terms', 'additive_terms']
+    assert df['series'].tolist() == ['C'] * 12 + ['B'] * 12
+    np.testing.assert_array_equal(df['yhat'][12:], other['yhat'].to_numpy(dtype=np.float32))
+    # 'B' keeps multiplicative_terms stored, so 'C' reads its own zeros rather than NaN
+    assert df['multiplicative_terms'].tolist() == [0.0] * 12 + [1.0] * 12
+    np.testing.assert_array_equal(df['additive_terms'], np.tile(forecast['yearly'].to_numpy(dtype=np.float32), 2))
+
+    assert len(store.read(columns=['yhat'])) == 36
+    assert list(read_forecast_store(path, 'A', columns=['yhat']).columns) == ['yhat']
+    empty = store.read([], columns=['ds', 'yhat'])
+    assert empty.empty and list(empty.columns) == ['series', 'ds', 'yhat']
+
+    with pytest.raises(KeyError):
+        store.read('missing')
+    with pytest.raises(KeyError):
+        store.read('A', columns=['not_a_column'])
+
+
+def test_near_duplicates_are_kept(tmp_path, forecast):
+    path = tmp_path / 'forecast.ufcs'
+    write_forecast_store(path, {'A': forecast.assign(additive_terms=forecast['yearly'] + 50)})
+    assert 'additive_terms' in ForecastStore(path).header['columns']
+
+
+def test_rejects_bad_magic_and_newer_version(tmp_path, forecast):
+    path = tmp_path / 'forecast.ufcs'
+    write_forecast_store(path, {'A': forecast})
+    raw = path.read_bytes()
+    magic, version, header_len = struct.unpack_from('<4sHI', raw)
+    assert (magic, version) == (MAGIC, FORMAT_VERSION)
+
+    bad_magic = tmp_path / 'bad_magic.ufcs'
+    bad_magic.write_bytes(b'XXXX' + raw[4:])
+    with pytest.raises(ValueError, match='Not a forecast store'):
+        ForecastStore(bad_magic)
+
+    newer = tmp_path / 'newer.ufcs'
+    newer.write_bytes(struct.pack('<4sHI', MAGIC, FORMAT_VERSION + 1, header_len) + raw[10:])
+    with pytest.raises(ValueError, match='newer'):
+        ForecastStore(newer)
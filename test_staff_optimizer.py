@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from staff_optimizer import STAFF_MONTHLY_COST, allocate_staff, optimize_staff_plan
+
+
+def served(alloc, demand, updates_per_staff=1000):
+    return np.minimum(alloc * updates_per_staff, demand).sum()
+
+
+def test_matches_brute_force_on_small_cases():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        units, months = rng.integers(1, 4), rng.integers(1, 3)
+        demand = rng.integers(0, 4000, (units, months)).astype(float)
+        capacity = rng.integers(0, 4, units)
+        pool, staff_months = int(rng.integers(0, 6)), int(rng.integers(0, 10))
+
+        alloc = allocate_staff(demand, capacity, pool, staff_months * STAFF_MONTHLY_COST)
+        assert (alloc <= capacity[:, None]).all()
+        assert (alloc.sum(axis=0) <= pool).all()
+        assert alloc.sum() <= staff_months
+
+        best = 0
+        for cells in itertools.product(*[range(c + 1) for c in np.repeat(capacity, months)]):
+            x = np.array(cells).reshape(units, months)
+            if (x.sum(axis=0) <= pool).all() and x.sum() <= staff_months:
+                best = max(best, served(x, demand))
+        assert served(alloc, demand) == pytest.approx(best)
+
+
+def test_pool_is_binding():
+    alloc = allocate_staff([[5000, 1000], [3000, 1000]], 10, 4, 100 * STAFF_MONTHLY_COST)
+    assert alloc.sum(axis=0).tolist() == [4, 2]
+    assert served(alloc, np.array([[5000, 1000], [3000, 1000]])) == 6000
+
+
+def test_budget_is_binding():
+    # partly-loaded operators go last: the 3,000-update row takes all three staff
+    alloc = allocate_staff([[100], [100], [100], [3000]], 10, 10, 3 * STAFF_MONTHLY_COST)
+    assert alloc.ravel().tolist() == [0, 0, 0, 3]
+
+
+def test_state_capacity_is_binding():
+    alloc = allocate_staff([[5000], [5000]], [2, 10], 100, 100 * STAFF_MONTHLY_COST)
+    assert alloc.ravel().tolist() == [2, 5]
+
+
+def test_rejects_non_positive_updates_per_staff():
+    with pytest.raises(ValueError):
+        allocate_staff([[1000]], 1, 1, STAFF_MONTHLY_COST, updates_per_staff=0)
+
+
+@pytest.mark.parametrize('capacity', [np.nan, np.inf, -1])
+def test_rejects_invalid_capacity(capacity):
+    with pytest.raises(ValueError):
+        allocate_staff([[1000], [1000]], [1, capacity], 1, STAFF_MONTHLY_COST)
+
+
+def test_optimize_staff_plan_rejects_nan_state_cap():
+    forecast_df = pd.DataFrame({'ds': pd.to_datetime(['2026-01-31']), 'yhat': [5000.0]})
+    merged_df = pd.DataFrame({'state': ['A', 'B'], 'total_updates': [1, 1]})
+    with pytest.raises(ValueError):
+        optimize_staff_plan(forecast_df, merged_df, 10, 10 * STAFF_MONTHLY_COST, {'B': np.nan})
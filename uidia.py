@@ -5,7 +5,11 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 import io
+import os
 import requests
+from staff_optimizer import STAFF_MONTHLY_COST, UPDATES_PER_STAFF, optimize_staff_plan
+from forecast_store import read_forecast_store
+from background_loader import BackgroundLoader
 
 # --------------------------- CSS STYLING --------------------------- 
 st.markdown("""
@@ -64,33 +68,27 @@ MERGED_FILE_ID = "1qORy0hmGIsUzlJA3mP33JcCCEFO7v9qz"
 GOOGLE_DRIVE_FORECAST = f"https://drive.google.com/uc?export=download&id={FORECAST_FILE_ID}"
 GOOGLE_DRIVE_MERGED = f"https://drive.google.com/uc?export=download&id={MERGED_FILE_ID}"
 
-# --------------------------- LOAD DATA FROM GOOGLE DRIVE --------------------------- 
+# Compact binary copy of forecast_output.csv (see forecast_store.py)
+FORECAST_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forecast_output.ufcs")
+
+# --------------------------- LOAD DATA --------------------------- 
 @st.cache_data
-def load_data():
+def load_forecast():
     try:
-        # Download and read CSV files from Google Drive
-        forecast_url = GOOGLE_DRIVE_FORECAST
-        merged_url = GOOGLE_DRIVE_MERGED
-        
-        forecast_df = pd.read_csv(forecast_url)
-        merged_df = pd.read_csv(merged_url)
+        if os.path.exists(FORECAST_STORE):
+            forecast_df = read_forecast_store(
+                FORECAST_STORE, series='national',
+                columns=['ds', 'yhat', 'demand_risk', 'staff_needed', 'recommended_action']
+            )
+        else:
+            forecast_df = pd.read_csv(GOOGLE_DRIVE_FORECAST)
         
         # Fix dates
         forecast_df['ds'] = pd.to_datetime(forecast_df['ds'])
         
-        if 'date' in merged_df.columns:
-            merged_df['date'] = pd.to_datetime(merged_df['date'], dayfirst=True)
-            DATE_COL = 'date'
-        elif 'ds' in merged_df.columns:
-            merged_df['ds'] = pd.to_datetime(merged_df['ds'])
-            DATE_COL = 'ds'
-        else:
-            st.error("No date column found in biometric dataset.")
-            st.stop()
-        
         # Add missing columns
         if 'monthly_staff_cost' not in forecast_df.columns:
-            forecast_df['monthly_staff_cost'] = forecast_df['staff_needed'] * 25000
+            forecast_df['monthly_staff_cost'] = forecast_df['staff_needed'] * STAFF_MONTHLY_COST
         
         if 'best_case' not in forecast_df.columns:
             forecast_df['best_case'] = forecast_df['yhat'] * 0.9
@@ -108,18 +106,54 @@ def load_data():
                 forecast_df['demand_risk'] == 'High', 'Recruit Immediately', 'Monitor Closely'
             )
         
-        # Historical total updates
-        merged_df['total_updates'] = merged_df['bio_age_5_17'] + merged_df['bio_age_17_']
-        
-        st.success(f"✅ Data loaded successfully from Google Drive!\n📊 Forecast: {len(forecast_df)} rows\n📈 Biometric: {len(merged_df)} rows")
-        return forecast_df, merged_df, DATE_COL
+        return forecast_df
         
     except Exception as e:
-        st.error(f"❌ Error loading data from Google Drive: {str(e)}")
-        st.info("💡 Make sure both Google Drive files are set to 'Anyone with the link can view'")
+        st.error(f"❌ Error loading forecast data: {str(e)}")
+        st.info("💡 Make sure the Google Drive files are set to 'Anyone with the link can view'")
         st.stop()
 
-forecast_df, merged_df, DATE_COL = load_data()
+def load_merged():
+    # Runs on a worker thread: raise instead of calling st.error/st.stop
+    response = requests.get(GOOGLE_DRIVE_MERGED, timeout=30)
+    response.raise_for_status()
+    merged_df = pd.read_csv(io.StringIO(response.text))
+    
+    if 'date' in merged_df.columns:
+        merged_df['date'] = pd.to_datetime(merged_df['date'], dayfirst=True)
+        DATE_COL = 'date'
+    elif 'ds' in merged_df.columns:
+        merged_df['ds'] = pd.to_datetime(merged_df['ds'])
+        DATE_COL = 'ds'
+    else:
+        raise ValueError("No date column found in biometric dataset.")
+    
+    # Historical total updates
+    merged_df['total_updates'] = merged_df['bio_age_5_17'] + merged_df['bio_age_17_']
+    return merged_df, DATE_COL
+
+@st.cache_resource
+def get_merged_loader():
+    # Download the large merged history once, in the background, for every session
+    return BackgroundLoader(load_merged)
+
+# The forecast store acts as a tiny precomputed snapshot: the summary and forecast render
+# straight from it while the merged history is still downloading.
+forecast_df = load_forecast()
+merged_loader = get_merged_loader()
+merged_data, merged_error = merged_loader.poll()
+merged_ready = merged_data is not None
+
+if merged_error is not None:
+    st.error(f"❌ Error loading data from Google Drive: {str(merged_error)}")
+    st.info("💡 Make sure both Google Drive files are set to 'Anyone with the link can view'")
+if merged_ready:
+    merged_df, DATE_COL = merged_data
+    st.success(f"✅ Data loaded successfully!\n📊 Forecast: {len(forecast_df)} rows\n📈 Biometric: {len(merged_df)} rows")
+else:
+    merged_df, DATE_COL = pd.DataFrame(), None
+
+LOADING_NOTICE = "⏳ Historical data is still loading in the background. This section will appear when it is ready."
 
 # --------------------------- SIDEBAR --------------------------- 
 with st.sidebar:
@@ -224,38 +258,89 @@ with tab2:
         use_container_width=True,
         hide_index=True
     )
+    
+    st.markdown('<h4 class="sub-header">Optimized Allocation vs Naive Plan</h4>', unsafe_allow_html=True)
+    if not merged_ready:
+        st.info(LOADING_NOTICE)
+    elif 'state' in merged_df.columns:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            operator_pool = st.number_input("Operator Pool", min_value=0, step=100,
+                                            value=int(forecast_df['staff_needed'].max()))
+        with col2:
+            default_capacity = st.number_input("Default Max Staff per State", min_value=0, step=50,
+                                             value=int(forecast_df['staff_needed'].max()))
+        with col3:
+            budget = st.number_input("Budget (₹)", min_value=0, step=STAFF_MONTHLY_COST * 100,
+                                     value=int(forecast_df['monthly_staff_cost'].sum()))
+        
+        capacity_data = st.data_editor(
+            pd.DataFrame({'state': sorted(merged_df['state'].unique()), 'max_staff': int(default_capacity)}),
+            column_config={
+                'state': 'State',
+                'max_staff': st.column_config.NumberColumn('Max Staff', min_value=0, step=1)
+            },
+            disabled=['state'],
+            use_container_width=True,
+            hide_index=True,
+            key='state_capacity_editor'
+        )
+        state_capacity = dict(zip(capacity_data['state'], capacity_data['max_staff'].fillna(0).astype(int)))
+        
+        # Keep the optimizer on the same updates-per-operator ratio as the naive plan,
+        # falling back to the default ratio when the naive plan has no staff at all
+        naive_staff = forecast_df['staff_needed'].sum()
+        naive_ratio = forecast_df['yhat'].sum() / naive_staff if naive_staff > 0 else 0
+        updates_per_staff = naive_ratio if naive_ratio > 0 else UPDATES_PER_STAFF
+        plan_df, _ = optimize_staff_plan(forecast_df, merged_df, operator_pool, budget, state_capacity,
+                                         updates_per_staff=updates_per_staff)
+        compare_data = forecast_df[['ds', 'yhat', 'staff_needed', 'monthly_staff_cost']].merge(plan_df, on='ds')
+        
+        st.dataframe(
+            compare_data.rename(columns={
+                'ds':'Month','yhat':'Expected','staff_needed':'Naive Staff',
+                'monthly_staff_cost':'Naive Cost (₹)','optimized_staff':'Optimized Staff',
+                'optimized_cost':'Optimized Cost (₹)','served_demand':'Served',
+                'coverage_pct':'Coverage (%)'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
 
 with tab3:
-    col1, col2 = st.columns(2)
+    if not merged_ready:
+        st.info(LOADING_NOTICE)
+    else:
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown('<h4 class="sub-header">Peak Load Months</h4>', unsafe_allow_html=True)
-        monthly_hist = merged_df.groupby(DATE_COL)['total_updates'].sum().reset_index()
-        peak_months = monthly_hist.nlargest(10, 'total_updates')
+        with col1:
+            st.markdown('<h4 class="sub-header">Peak Load Months</h4>', unsafe_allow_html=True)
+            monthly_hist = merged_df.groupby(DATE_COL)['total_updates'].sum().reset_index()
+            peak_months = monthly_hist.nlargest(10, 'total_updates')
         
-        fig_peak = px.bar(
-            peak_months.rename(columns={DATE_COL: 'Month'}),
-            x='Month', y='total_updates',
-            title="Top 10 Peak Months",
-            color='total_updates',
-            color_continuous_scale='Viridis'
-        )
-        st.plotly_chart(fig_peak, use_container_width=True)
+            fig_peak = px.bar(
+                peak_months.rename(columns={DATE_COL: 'Month'}),
+                x='Month', y='total_updates',
+                title="Top 10 Peak Months",
+                color='total_updates',
+                color_continuous_scale='Viridis'
+            )
+            st.plotly_chart(fig_peak, use_container_width=True)
     
-    with col2:
-        st.markdown('<h4 class="sub-header">Top States</h4>', unsafe_allow_html=True)
-        filtered_merged = merged_df[merged_df['state'].isin(states)]
-        state_demand = filtered_merged.groupby('state')['total_updates'].sum().sort_values(ascending=False)
+        with col2:
+            st.markdown('<h4 class="sub-header">Top States</h4>', unsafe_allow_html=True)
+            filtered_merged = merged_df[merged_df['state'].isin(states)]
+            state_demand = filtered_merged.groupby('state')['total_updates'].sum().sort_values(ascending=False)
         
-        fig_states = px.bar(
-            state_demand.reset_index(),
-            x='total_updates', y='state',
-            orientation='h',
-            title="State-wise Demand",
-            color='total_updates',
-            color_continuous_scale='Blues'
-        )
-        st.plotly_chart(fig_states, use_container_width=True)
+            fig_states = px.bar(
+                state_demand.reset_index(),
+                x='total_updates', y='state',
+                orientation='h',
+                title="State-wise Demand",
+                color='total_updates',
+                color_continuous_scale='Blues'
+            )
+            st.plotly_chart(fig_states, use_container_width=True)
 
 with tab4:
     col1, col2 = st.columns(2)
@@ -283,37 +368,40 @@ with tab4:
 # --------------------------- AGE ANALYSIS --------------------------- 
 st.markdown('<h2 class="sub-header">👥 Demographics Analysis</h2>', unsafe_allow_html=True)
 
-col1, col2 = st.columns(2)
+if not merged_ready:
+    st.info(LOADING_NOTICE)
+else:
+    col1, col2 = st.columns(2)
 
-with col1:
-    if 'bio_age_5_17' in merged_df.columns and 'bio_age_17_' in merged_df.columns:
-        age_demand = merged_df[['bio_age_5_17','bio_age_17_']].sum()
-        age_df = pd.DataFrame({
-            "Age Group": ["5–17 years", "18+ years"],
-            "Updates": age_demand.values
-        })
+    with col1:
+        if 'bio_age_5_17' in merged_df.columns and 'bio_age_17_' in merged_df.columns:
+            age_demand = merged_df[['bio_age_5_17','bio_age_17_']].sum()
+            age_df = pd.DataFrame({
+                "Age Group": ["5–17 years", "18+ years"],
+                "Updates": age_demand.values
+            })
         
-        fig_age = px.pie(age_df, values='Updates', names='Age Group', 
-                         title="Age Group Distribution",
-                         hole=0.4, color_discrete_sequence=['#ff7f0e', '#1f77b4'])
-        st.plotly_chart(fig_age, use_container_width=True)
+            fig_age = px.pie(age_df, values='Updates', names='Age Group', 
+                             title="Age Group Distribution",
+                             hole=0.4, color_discrete_sequence=['#ff7f0e', '#1f77b4'])
+            st.plotly_chart(fig_age, use_container_width=True)
 
-with col2:
-    filtered_merged = merged_df[merged_df['state'].isin(states)]
-    if age_groups and 'bio_age_5_17' in filtered_merged.columns and 'bio_age_17_' in filtered_merged.columns:
-        age_data = {}
-        for group in age_groups:
-            if group == '5-17 years':
-                age_data[group] = filtered_merged['bio_age_5_17'].sum()
-            else:
-                age_data[group] = filtered_merged['bio_age_17_'].sum()
+    with col2:
+        filtered_merged = merged_df[merged_df['state'].isin(states)]
+        if age_groups and 'bio_age_5_17' in filtered_merged.columns and 'bio_age_17_' in filtered_merged.columns:
+            age_data = {}
+            for group in age_groups:
+                if group == '5-17 years':
+                    age_data[group] = filtered_merged['bio_age_5_17'].sum()
+                else:
+                    age_data[group] = filtered_merged['bio_age_17_'].sum()
         
-        fig_age_bar = px.bar(
-            pd.DataFrame(list(age_data.items()), columns=['Age Group', 'Updates']),
-            x='Updates', y='Age Group', orientation='h',
-            title="Filtered Age Analysis"
-        )
-        st.plotly_chart(fig_age_bar, use_container_width=True)
+            fig_age_bar = px.bar(
+                pd.DataFrame(list(age_data.items()), columns=['Age Group', 'Updates']),
+                x='Updates', y='Age Group', orientation='h',
+                title="Filtered Age Analysis"
+            )
+            st.plotly_chart(fig_age_bar, use_container_width=True)
 
 # --------------------------- FOOTER --------------------------- 
 st.markdown("---")
@@ -322,3 +410,18 @@ st.markdown("""
     🚀 Built for UIDAI Hackathon | AI-Driven Biometric Service Planning | Jan 2026
 </div>
 """, unsafe_allow_html=True)
+
+# --------------------------- FINISH BACKGROUND LOAD --------------------------- 
+# The summary and forecast are already on screen. Poll the download from a fragment so the
+# page stays interactive, then rerun so the Historical tab, Demographics section and state
+# filter fill in.
+@st.fragment(run_every=1)
+def watch_merged_load():
+    data, error = merged_loader.poll()
+    if data is not None or error is not merged_error:
+        st.rerun()
+    st.caption("⏳ Loading historical data..." if merged_loader.loading else "⏳ Retrying the download shortly...")
+
+if not merged_ready:
+    with st.sidebar:
+        watch_merged_load()